@@ -19,12 +19,14 @@ This is the single entry point for both CLI and Web interfaces.
 """
 from __future__ import annotations
 
+import asyncio
 import re
 from typing import Dict, Any, List, Optional, Iterator
 
 from app.llm.client import LLMClient
 from app.router import route, RouteResult
-from app.rag.ingestion import ingest_file, list_indexed_sources, get_chunk_count
+from app.rag.ingestion import ingest_file, ingest_files, list_indexed_sources, get_chunk_count
+from app.rag.embedding_cache import embed_query
 from app.rag.retrieval import hybrid_search, build_context_block, format_citations
 from app.rag.grounding import validate_citations
 from app.memory.memory_manager import maybe_write_memory, build_memory_context
@@ -131,6 +133,14 @@ class Chatbot:
     def ingest(self, file_path: str) -> Dict[str, Any]:
         return ingest_file(file_path)
 
+    def ingest_many(self, file_paths: List[str], batch_size: int = 64) -> List[Dict[str, Any]]:
+        """Ingest several files with a single batched embedding pass."""
+        return ingest_files(file_paths, batch_size=batch_size)
+
+    def embed_query_cached(self, text: str) -> List[float]:
+        """Query embedding via the shared LRU cache (used by retrieval too)."""
+        return embed_query(text)
+
     def list_sources(self) -> List[str]:
         return list_indexed_sources()
 
@@ -179,6 +189,10 @@ class Chatbot:
         else:
             return self._general_pipeline(user_message)
 
+    async def achat(self, user_message: str) -> Dict[str, Any]:
+        """Async wrapper around chat() — runs the blocking pipeline in a worker thread."""
+        return await asyncio.to_thread(self.chat, user_message)
+
     def stream_chat(self, user_message: str) -> Iterator[Dict[str, Any]]:
         """
         Streaming version of chat().
@@ -12,6 +12,8 @@ USER_MEMORY_FILE = BASE_DIR / "USER_MEMORY.md"
 COMPANY_MEMORY_FILE = BASE_DIR / "COMPANY_MEMORY.md"
 SAMPLE_DOCS_DIR  = BASE_DIR / "sample_docs"
 ARTIFACTS_DIR    = BASE_DIR / "artifacts"
+QUERY_EMBED_CACHE_FILE = ARTIFACTS_DIR / "query_embed_cache.json"
+INGEST_MANIFEST_FILE   = ARTIFACTS_DIR / "ingest_manifest.json"
 
 # LLM
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
@@ -30,3 +32,13 @@ MEMORY_CONFIDENCE_THRESHOLD = 0.65
 
 # Sandbox
 SANDBOX_TIMEOUT = 30  # seconds — raised to accommodate rich analytics script
+
+# Diagnostics — RAG_INSTRUMENT=1 logs per-phase timings for each web query
+RAG_INSTRUMENT = os.getenv("RAG_INSTRUMENT", "") == "1"
+
+# Web app: load the embedding model in the background at startup (RAG_WARMUP=0 to skip)
+RAG_WARMUP = os.getenv("RAG_WARMUP", "1") == "1"
+
+# Web app: replay identical questions (same manager, memory and index) from a
+# 60 s in-process answer cache (RAG_ANSWER_CACHE=1 to enable)
+RAG_ANSWER_CACHE = os.getenv("RAG_ANSWER_CACHE", "") == "1"
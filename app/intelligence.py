@@ -236,9 +236,9 @@ class SiteWatch:
             ...
     """
 
-    def __init__(self, user_id: str = "default"):
+    def __init__(self, user_id: str = "default", llm: Optional[LLMClient] = None):
         self.user_id = user_id
-        self.llm = LLMClient()
+        self.llm = llm or LLMClient()
         self.history: List[Dict[str, str]] = []
         self._init_namespace()
 
@@ -473,8 +473,7 @@ class SiteWatch:
         ev.recommendation = _parse_recommendation(ev.answer)
         ev.risk_level     = _parse_risk_level(ev.answer)
 
-        self.history.append({"role": "user",      "content": question})
-        self.history.append({"role": "assistant", "content": ev.answer})
+        self.record_turn(question, ev.answer)
 
         mem = maybe_write_memory(
             question, ev.answer, self.llm,
@@ -488,7 +487,7 @@ class SiteWatch:
 
     def _extract_location(self, msg: str) -> Optional[str]:
         # Pass recent history as context for city disambiguation
-        ctx_turns = self.history[-4:] if self.history else []
+        ctx_turns = self.context_window()
         ctx = " | ".join(
             f"{t['role']}: {t['content'][:120]}" for t in ctx_turns
         ) or "none"
@@ -500,6 +499,15 @@ class SiteWatch:
             return None
         return resp
 
+    def record_turn(self, question: str, answer: str):
+        """Append one user/assistant exchange to the session history."""
+        self.history.append({"role": "user",      "content": question})
+        self.history.append({"role": "assistant", "content": answer})
+
+    def context_window(self) -> List[Dict[str, str]]:
+        """The recent turns an answer can depend on (location disambiguation)."""
+        return self.history[-4:]
+
     def clear_history(self):
         self.history = []
 
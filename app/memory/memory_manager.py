@@ -23,6 +23,7 @@ from __future__ import annotations
 
 import json
 import re
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
@@ -203,6 +204,11 @@ def _is_duplicate(
 
 # ── Memory writer ─────────────────────────────────────────────────────────
 
+# Serialises dedup-check + append across threads (concurrent chats, eval and
+# sanity workers) so two writers can't both miss each other's entry or lose
+# one another's read-modify-write of the same file.
+_write_lock = threading.Lock()
+
 def append_memory(
     target: str,
     summary: str,
@@ -277,28 +283,29 @@ def maybe_write_memory(
             "skipped_reason": "low_confidence_or_empty",
         }
 
-    # Deduplication check: don't write if this fact is already stored
-    if _is_duplicate(
-        decision["summary"], decision["target"], llm_client,
-        user_mem_file=user_mem_file,
-        company_mem_file=company_mem_file,
-    ):
-        return {
-            "wrote":      False,
-            "target":     decision["target"],
-            "summary":    decision["summary"],
-            "confidence": decision["confidence"],
-            "file":       None,
-            "skipped_reason": "duplicate",
-        }
-
-    file_written = append_memory(
-        decision["target"],
-        decision["summary"],
-        decision["confidence"],
-        user_mem_file=user_mem_file,
-        company_mem_file=company_mem_file,
-    )
+    with _write_lock:
+        # Deduplication check: don't write if this fact is already stored
+        if _is_duplicate(
+            decision["summary"], decision["target"], llm_client,
+            user_mem_file=user_mem_file,
+            company_mem_file=company_mem_file,
+        ):
+            return {
+                "wrote":      False,
+                "target":     decision["target"],
+                "summary":    decision["summary"],
+                "confidence": decision["confidence"],
+                "file":       None,
+                "skipped_reason": "duplicate",
+            }
+
+        file_written = append_memory(
+            decision["target"],
+            decision["summary"],
+            decision["confidence"],
+            user_mem_file=user_mem_file,
+            company_mem_file=company_mem_file,
+        )
     return {
         "wrote":          True,
         "target":         decision["target"],
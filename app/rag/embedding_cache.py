@@ -0,0 +1,136 @@
+"""
+Query Embedding Cache
+=====================
+Identical questions (eval harness re-runs, repeated chat turns) used to be
+re-encoded on every call. This module keeps recent query vectors in a small
+in-process LRU keyed by the SHA-256 of the query text, so a repeated query
+costs a dict lookup instead of a model forward pass.
+
+Entries expire after a TTL. Within one process the model never changes, so
+this mainly bounds how long a persisted file is reused: the model name is
+checked on load, but the name does not pin the weights, and a library upgrade
+or a re-downloaded checkpoint can shift the vectors under the same name.
+
+Scripts that run the same fixed questions every time (run_sanity) can
+persist the cache to QUERY_EMBED_CACHE_FILE between processes with
+load_query_cache() / save_query_cache(). The file is plain JSON (never
+pickle — loading it must not be able to run code), records which
+EMBEDDING_MODEL produced the vectors and is ignored if that changes.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Tuple
+
+from app.config import EMBEDDING_MODEL, QUERY_EMBED_CACHE_FILE
+from app.rag.ingestion import get_embed_model
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of query → embedding with a per-entry TTL."""
+
+    def __init__(self, maxsize: int = 512, ttl_seconds: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[bytes, Tuple[List[float], float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get(self, text: str) -> List[float] | None:
+        key = self._key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            vec, stored_at = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return vec
+
+    def put(self, text: str, vec: List[float]) -> None:
+        key = self._key(text)
+        with self._lock:
+            self._entries[key] = (vec, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def save(self, path: Path, model_name: str) -> None:
+        """Write the live entries to `path` as JSON (atomic replace)."""
+        with self._lock:
+            entries = [[key.hex(), vec, stored_at]
+                       for key, (vec, stored_at) in self._entries.items()]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": model_name, "entries": entries}, f)
+        os.replace(tmp, path)
+
+    def load(self, path: Path, model_name: str) -> int:
+        """
+        Merge unexpired entries from `path`; returns how many were inserted
+        (keys already cached keep their in-process value).
+        A missing, unreadable or malformed file loads nothing — never raises.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+            if not isinstance(payload, dict) or payload.get("model") != model_name:
+                return 0
+            now = time.time()
+            fresh = []
+            for key_hex, vec, stored_at in payload["entries"]:
+                if now - float(stored_at) <= self.ttl_seconds:
+                    fresh.append((bytes.fromhex(key_hex),
+                                  ([float(x) for x in vec], float(stored_at))))
+        except (OSError, ValueError, TypeError, KeyError):
+            return 0
+        with self._lock:
+            new = [(key, entry) for key, entry in fresh if key not in self._entries]
+            # Loaded entries are older than live ones: put them at the LRU end
+            # (file order preserved) so the maxsize trim evicts them first
+            for key, entry in reversed(new):
+                self._entries[key] = entry
+                self._entries.move_to_end(key, last=False)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return sum(1 for key, _ in new if key in self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_query_cache = EmbeddingCache()
+
+
+def embed_query(text: str) -> List[float]:
+    """Return the embedding for a query, encoding it only on a cache miss."""
+    vec = _query_cache.get(text)
+    if vec is None:
+        vec = get_embed_model().encode([text], show_progress_bar=False)[0].tolist()
+        _query_cache.put(text, vec)
+    return vec
+
+
+def load_query_cache(path: Path = QUERY_EMBED_CACHE_FILE) -> int:
+    """Seed the query cache from disk (no-op if missing or built by another model)."""
+    return _query_cache.load(path, EMBEDDING_MODEL)
+
+
+def save_query_cache(path: Path = QUERY_EMBED_CACHE_FILE) -> None:
+    _query_cache.save(path, EMBEDDING_MODEL)
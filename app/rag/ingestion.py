@@ -12,9 +12,12 @@ Supports: .pdf, .html, .htm, .txt, .md
 from __future__ import annotations
 
 import hashlib
+import json
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 import chromadb
 from chromadb.utils import embedding_functions
@@ -25,8 +28,15 @@ from app.config import (
     EMBEDDING_MODEL,
     CHUNK_SIZE,
     CHUNK_OVERLAP,
+    INGEST_MANIFEST_FILE,
 )
 
+# Both singletons below are process-wide: every caller (CLI commands,
+# file_manager, retrieval, the eval harness' worker threads) shares one model
+# and one ChromaDB client. The lock makes first-use initialisation safe when
+# several threads race to it; the fast path stays lock-free.
+_init_lock = threading.Lock()
+
 # ── Singleton embedding model (lazy load) ──────────────────────────────────
 _embed_model: SentenceTransformer | None = None
 
@@ -34,7 +44,9 @@ _embed_model: SentenceTransformer | None = None
 def get_embed_model() -> SentenceTransformer:
     global _embed_model
     if _embed_model is None:
-        _embed_model = SentenceTransformer(EMBEDDING_MODEL)
+        with _init_lock:
+            if _embed_model is None:
+                _embed_model = SentenceTransformer(EMBEDDING_MODEL)
     return _embed_model
 
 
@@ -46,12 +58,14 @@ _collection = None
 def get_collection():
     global _chroma_client, _collection
     if _collection is None:
-        CHROMA_DIR.mkdir(parents=True, exist_ok=True)
-        _chroma_client = chromadb.PersistentClient(path=str(CHROMA_DIR))
-        _collection = _chroma_client.get_or_create_collection(
-            name="documents",
-            metadata={"hnsw:space": "cosine"},
-        )
+        with _init_lock:
+            if _collection is None:
+                CHROMA_DIR.mkdir(parents=True, exist_ok=True)
+                _chroma_client = chromadb.PersistentClient(path=str(CHROMA_DIR))
+                _collection = _chroma_client.get_or_create_collection(
+                    name="documents",
+                    metadata={"hnsw:space": "cosine"},
+                )
     return _collection
 
 
@@ -138,7 +152,8 @@ def chunk_text(
 
 
 def _make_chunk(text: str, source: str, idx: int) -> Dict[str, Any]:
-    uid = hashlib.md5(f"{source}-{idx}-{text[:40]}".encode()).hexdigest()
+    # Full text in the id: an edited chunk gets a new id and is re-embedded
+    uid = hashlib.md5(f"{source}-{idx}-{text}".encode()).hexdigest()
     return {
         "id": uid,
         "text": text.strip(),
@@ -149,14 +164,31 @@ def _make_chunk(text: str, source: str, idx: int) -> Dict[str, Any]:
 
 # ── Indexer ───────────────────────────────────────────────────────────────
 
-def index_chunks(chunks: List[Dict[str, Any]]) -> int:
+def index_chunks(chunks: List[Dict[str, Any]], batch_size: int = 32) -> int:
     """Embed and store chunks in ChromaDB. Returns number of new chunks added."""
+    return len(_index_chunks(chunks, batch_size))
+
+
+def _index_chunks(chunks: List[Dict[str, Any]], batch_size: int = 32) -> Set[str]:
+    """Embed the chunks not yet in ChromaDB in one encode() call, store them, return their ids."""
+    # Drop repeated ids (same file passed twice in one batch) — ChromaDB rejects them
+    seen: Set[str] = set()
+    chunks = [c for c in chunks if not (c["id"] in seen or seen.add(c["id"]))]
     if not chunks:
-        return 0
+        return set()
 
-    model = get_embed_model()
     collection = get_collection()
 
+    # Skip chunks already indexed before embedding — ids hash source, position
+    # and full text, so an unchanged chunk keeps its id and costs one lookup,
+    # not a model pass
+    existing = set(collection.get(ids=[c["id"] for c in chunks])["ids"])
+    chunks = [c for c in chunks if c["id"] not in existing]
+    if not chunks:
+        return set()
+
+    model = get_embed_model()
+
     texts      = [c["text"]    for c in chunks]
     ids        = [c["id"]      for c in chunks]
     metadatas  = [
@@ -164,26 +196,18 @@ def index_chunks(chunks: List[Dict[str, Any]]) -> int:
         for c in chunks
     ]
 
-    embeddings = model.encode(texts, show_progress_bar=False).tolist()
-
-    # Upsert (skip duplicates)
-    existing = set(collection.get(ids=ids)["ids"])
-    new_chunks = [
-        (id_, emb, meta, txt)
-        for id_, emb, meta, txt in zip(ids, embeddings, metadatas, texts)
-        if id_ not in existing
-    ]
+    embeddings = model.encode(
+        texts, batch_size=batch_size, show_progress_bar=False,
+    ).tolist()
 
-    if new_chunks:
-        n_ids, n_embs, n_metas, n_docs = zip(*new_chunks)
-        collection.add(
-            ids=list(n_ids),
-            embeddings=list(n_embs),
-            metadatas=list(n_metas),
-            documents=list(n_docs),
-        )
+    collection.add(
+        ids=ids,
+        embeddings=embeddings,
+        metadatas=metadatas,
+        documents=texts,
+    )
 
-    return len(new_chunks)
+    return set(ids)
 
 
 # ── Public API ────────────────────────────────────────────────────────────
@@ -194,21 +218,107 @@ def ingest_file(path: str | Path, original_name: str | None = None) -> Dict[str,
     Returns a summary dict.
     original_name: use this as the source label (for uploaded temp files).
     """
-    path = Path(path)
-    if not path.exists():
-        raise FileNotFoundError(f"File not found: {path}")
+    return ingest_files([path], [original_name])[0]
+
 
+def _parse_and_chunk(path: Path, original_name: Optional[str]) -> Tuple[str, str, List[Dict[str, Any]]]:
     source_name = original_name or path.name
     raw_text = parse_file(path)
-    chunks   = chunk_text(raw_text, source=source_name)
-    added    = index_chunks(chunks)
+    return source_name, raw_text, chunk_text(raw_text, source=source_name)
 
-    return {
-        "file":         source_name,
-        "total_chars":  len(raw_text),
-        "total_chunks": len(chunks),
-        "new_chunks":   added,
-    }
+
+def _prune_stale_chunks(parsed: List[Tuple[str, str, List[Dict[str, Any]]]]) -> None:
+    """Drop chunks of re-ingested sources whose ids are no longer produced (edited text)."""
+    collection = get_collection()
+    for source_name, _, chunks in parsed:
+        current = {c["id"] for c in chunks}
+        stored = collection.get(where={"source": source_name}, include=[])["ids"]
+        stale = [i for i in stored if i not in current]
+        if stale:
+            collection.delete(ids=stale)
+
+
+def ingest_files(
+    paths: List[str | Path],
+    original_names: Optional[List[Optional[str]]] = None,
+    batch_size: int = 64,
+) -> List[Dict[str, Any]]:
+    """
+    Batch pipeline: parse + chunk every file, then embed and index all chunks
+    together so the model sees full batches instead of one small batch per file.
+    Returns one ingest_file()-style summary dict per path, in order.
+    """
+    paths = [Path(p) for p in paths]
+    names = original_names or [None] * len(paths)
+    for path in paths:
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+
+    # Parse + chunk is file I/O (and pypdf work) per file — run it across a
+    # small thread pool. Embedding and the ChromaDB write stay a single step.
+    if len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(4, len(paths))) as pool:
+            parsed = list(pool.map(_parse_and_chunk, paths, names))
+    else:
+        parsed = [_parse_and_chunk(p, n) for p, n in zip(paths, names)]
+
+    added = _index_chunks([c for _, _, chunks in parsed for c in chunks], batch_size)
+    _prune_stale_chunks(parsed)
+
+    return [
+        {
+            "file":         source_name,
+            "total_chars":  len(raw_text),
+            "total_chunks": len(chunks),
+            "new_chunks":   sum(1 for c in chunks if c["id"] in added),
+        }
+        for source_name, raw_text, chunks in parsed
+    ]
+
+
+# ── Skip-unchanged ingest manifest ────────────────────────────────────────
+
+def file_digest(path: Path) -> str:
+    """Content hash of a file (blake2b-128), for change detection."""
+    return hashlib.blake2b(Path(path).read_bytes(), digest_size=16).hexdigest()
+
+
+class IngestManifest:
+    """
+    Records, per source file, what was last ingested (mtime_ns, content hash,
+    chunk count) so scripts that re-ingest the same sample docs every run can
+    skip the unchanged ones. Shared by run_sanity and the eval harness.
+    """
+
+    def __init__(self, path: Path = INGEST_MANIFEST_FILE):
+        self.path = path
+        try:
+            self._entries: Dict[str, Dict[str, Any]] = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._entries = {}
+
+    def unchanged(self, path: Path, indexed: Set[str]) -> Optional[Dict[str, Any]]:
+        """
+        The last ingest summary for `path` if it is still in `indexed` and its
+        content is unchanged (same mtime, or same hash after a touch); else None.
+        """
+        entry = self._entries.get(path.name)
+        if not entry or path.name not in indexed:
+            return None
+        if entry["mtime_ns"] != path.stat().st_mtime_ns and entry["hash"] != file_digest(path):
+            return None
+        return {"file": path.name, "total_chunks": entry["chunk_count"]}
+
+    def record(self, path: Path, result: Dict[str, Any]) -> None:
+        self._entries[path.name] = {
+            "mtime_ns":    path.stat().st_mtime_ns,
+            "hash":        file_digest(path),
+            "chunk_count": result["total_chunks"],
+        }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self._entries, indent=2), encoding="utf-8")
 
 
 def list_indexed_sources() -> List[str]:
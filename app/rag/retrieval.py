@@ -15,7 +15,8 @@ from rank_bm25 import BM25Okapi
 from sentence_transformers import SentenceTransformer
 
 from app.config import TOP_K
-from app.rag.ingestion import get_collection, get_embed_model
+from app.rag.ingestion import get_collection
+from app.rag.embedding_cache import embed_query
 
 
 # ── Dense retrieval ────────────────────────────────────────────────────────
@@ -31,8 +32,7 @@ def dense_search(query: str, k: int = TOP_K) -> List[Dict[str, Any]]:
     if collection.count() == 0:
         return []
 
-    model = get_embed_model()
-    q_emb = model.encode([query], show_progress_bar=False).tolist()
+    q_emb = [embed_query(query)]
 
     results = collection.query(
         query_embeddings=q_emb,
@@ -26,10 +26,11 @@ Analytics computed inside the sandbox subprocess:
       Temp  < 10 °C    → concrete pour risk (cold)
       Temp  > 35 °C    → concrete pour risk (heat)
       Precip > 2 mm/h  → waterproofing / finishing concern
-  • Structured JSON summary block appended to stdout
+  • Structured JSON summary written to summary.json in the sandbox working dir
 """
 from __future__ import annotations
 
+import inspect
 import json
 import os
 import subprocess
@@ -59,6 +60,48 @@ _HOURLY_VARS = (
 # Archive data lags ~5-7 days; requests touching the last 7 days → forecast
 _ARCHIVE_LAG_DAYS = 7
 
+# Structured summary side channel, relative to the sandbox working dir
+_SUMMARY_FILE = "summary.json"
+
+
+
+# ── Structured summary schema ────────────────────────────────────────────────
+# Defined once here; its source is also pasted into the sandbox script, so the
+# in-process "no data" path and the script can't drift apart.
+
+def make_summary(location, date_range, total_hours, temperature=None,
+                 precipitation=None, wind=None, humidity=None, risk_flags=None):
+    """Build the structured weather summary. Missing sections/fields are None;
+    with no measurements at all the overall risk is UNKNOWN, never LOW."""
+    schema = {
+        "temperature": ("mean_c", "max_c", "min_c", "std_dev", "missing_pct",
+                        "anomaly_count", "cold_pour_risk_pct", "heat_pour_risk_pct"),
+        "precipitation": ("total_mm", "peak_mm_per_hr", "rainy_hours",
+                          "heavy_hours_gt2mm", "missing_pct"),
+        "wind": ("mean_kmh", "max_kmh", "max_gust_kmh", "std_dev", "missing_pct",
+                 "anomaly_count", "crane_suspended_hrs", "glazing_suspended_hrs",
+                 "scaffold_caution_hrs"),
+        "humidity": ("mean_pct",),
+    }
+    measured = {"temperature": temperature, "precipitation": precipitation,
+                "wind": wind, "humidity": humidity}
+    summary = {"location": location, "date_range": date_range, "total_hours": total_hours}
+    for section, fields in schema.items():
+        values = measured[section] or {}
+        summary[section] = {k: values.get(k) for k in fields}
+    flags = list(risk_flags or [])
+    summary["risk_flags"] = flags
+    if not any(measured.values()):
+        summary["overall_risk"] = "UNKNOWN"
+    else:
+        summary["overall_risk"] = ("HIGH" if len(flags) >= 3
+                                   else "MEDIUM" if flags
+                                   else "LOW")
+    return summary
+
+
+_MAKE_SUMMARY_SRC = inspect.getsource(make_summary)
+
 
 # ── Geocoding helper ─────────────────────────────────────────────────────────
 
@@ -134,138 +177,183 @@ def fetch_forecast(
 def _build_analysis_script(weather_json: Dict, location_name: str) -> str:
     """
     Generate the Python analytics script that runs inside the sandbox subprocess.
-    Produces human-readable output + a structured JSON block at the end.
+    Prints the human-readable report and writes the structured summary to
+    summary.json in its working directory.
     """
     data_str = json.dumps(weather_json)
 
     script = textwrap.dedent(f"""\
-import json, math, statistics
+import json, math
+
+import numpy as np
 
 data = json.loads({repr(data_str)})
 hourly  = data.get("hourly", {{}})
 times   = hourly.get("time", [])
-temps   = hourly.get("temperature_2m", [])
-app_t   = hourly.get("apparent_temperature", [])
-precips = hourly.get("precipitation", [])
-winds   = hourly.get("windspeed_10m", [])
-gusts   = hourly.get("windgusts_10m", [])
-humid   = hourly.get("relativehumidity_2m", [])
+
+def as_array(series):
+    \"\"\"Convert once at ingest: None → NaN, everything else → float64.\"\"\"
+    return np.fromiter(
+        (np.nan if x is None else float(x) for x in series),
+        dtype=np.float64, count=len(series),
+    )
+
+temps   = as_array(hourly.get("temperature_2m", []))
+app_t   = as_array(hourly.get("apparent_temperature", []))
+precips = as_array(hourly.get("precipitation", []))
+winds   = as_array(hourly.get("windspeed_10m", []))
+gusts   = as_array(hourly.get("windgusts_10m", []))
+humid   = as_array(hourly.get("relativehumidity_2m", []))
 
 LOCATION = {repr(location_name)}
+SUMMARY_FILE = {repr(_SUMMARY_FILE)}
 
+{_MAKE_SUMMARY_SRC}
 # ── Helpers ──────────────────────────────────────────────────────────────────
+# Missing hours are NaN, so comparisons are False and nan* reductions skip them.
 
-def clean(series):
-    return [x for x in series if x is not None]
+def clean(a):
+    return a[~np.isnan(a)]
 
-def missingness(series):
-    if not series:
+def missingness(a):
+    if not a.size:
         return 100.0
-    return round(sum(1 for x in series if x is None) / len(series) * 100, 2)
-
-def rolling_avg(series, window):
-    result = []
-    for i in range(len(series)):
-        chunk = [x for x in series[max(0, i - window + 1):i + 1] if x is not None]
-        result.append(round(sum(chunk) / len(chunk), 2) if chunk else None)
-    return result
-
-def daily_volatility(series, times):
-    \"\"\"Return list of (date, stddev) pairs for each day.\"\"\"
-    by_day = {{}}
-    for t, v in zip(times, series):
-        if v is not None:
-            day = t[:10]
-            by_day.setdefault(day, []).append(v)
-    return [
-        (d, round(statistics.stdev(vs), 2) if len(vs) > 1 else 0.0)
-        for d, vs in sorted(by_day.items())
-    ]
-
-def detect_anomalies(series, times, threshold=2.0):
-    c = clean(series)
-    if len(c) < 3:
+    return round(float(np.isnan(a).mean() * 100), 2)
+
+def rolling_avg(a, window):
+    \"\"\"Trailing-window mean via prefix sums; NaN where a window has no data.\"\"\"
+    valid = ~np.isnan(a)
+    csum  = np.concatenate(([0.0], np.cumsum(np.where(valid, a, 0.0))))
+    ccnt  = np.concatenate(([0], np.cumsum(valid)))
+    hi    = np.arange(1, a.size + 1)
+    lo    = np.maximum(hi - window, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.round((csum[hi] - csum[lo]) / (ccnt[hi] - ccnt[lo]), 2)
+
+def last(a):
+    \"\"\"Last element for display — 'N/A' when empty or missing.\"\"\"
+    return "N/A" if not a.size or np.isnan(a[-1]) else float(a[-1])
+
+def daily_volatility(a, times):
+    \"\"\"Return list of (date, stddev) pairs for each day (bincount group-by).\"\"\"
+    n = min(len(times), a.size)
+    valid = ~np.isnan(a[:n])
+    if not valid.any():
         return []
-    mean = sum(c) / len(c)
-    std  = statistics.stdev(c)
-    if std == 0:
+    v = a[:n][valid]
+    days, idx = np.unique(np.array([t[:10] for t in times[:n]])[valid], return_inverse=True)
+    cnt  = np.bincount(idx)
+    dev  = v - (np.bincount(idx, weights=v) / cnt)[idx]
+    ss   = np.bincount(idx, weights=dev * dev)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sd = np.where(cnt > 1, np.sqrt(ss / (cnt - 1)), 0.0)
+    return [(str(d), round(float(s), 2)) for d, s in zip(days, sd)]
+
+def mean_std(c):
+    \"\"\"Mean and sample σ of a NaN-free array, computed together once per series.\"\"\"
+    if not c.size:
+        return 0.0, 0.0
+    mean = float(c.mean())
+    if c.size < 2:
+        return mean, 0.0
+    dev = c - mean
+    return mean, math.sqrt(float(np.dot(dev, dev)) / (c.size - 1))
+
+def detect_anomalies(a, times, mean, std, threshold=2.0):
+    \"\"\"Flag |z| > threshold, reusing the series' precomputed mean and σ.\"\"\"
+    if np.count_nonzero(~np.isnan(a)) < 3 or std == 0:
         return []
+    dev  = a - mean
+    hits = np.flatnonzero(np.abs(dev) > threshold * std)
     return [
-        (times[i] if i < len(times) else "?", round(v, 2), round((v - mean) / std, 2))
-        for i, v in enumerate(series)
-        if v is not None and abs(v - mean) > threshold * std
+        (times[i] if i < len(times) else "?", round(float(a[i]), 2), round(float(dev[i] / std), 2))
+        for i in hits
     ]
 
-def pct_hours_above(series, threshold):
-    c = clean(series)
-    if not c:
+def pct_hours_above(a, threshold):
+    n = np.count_nonzero(~np.isnan(a))
+    if not n:
         return 0.0
-    return round(sum(1 for x in c if x > threshold) / len(c) * 100, 1)
+    return round(np.count_nonzero(a > threshold) / n * 100, 1)
 
-def pct_hours_below(series, threshold):
-    c = clean(series)
-    if not c:
+def pct_hours_below(a, threshold):
+    n = np.count_nonzero(~np.isnan(a))
+    if not n:
         return 0.0
-    return round(sum(1 for x in c if x < threshold) / len(c) * 100, 1)
+    return round(np.count_nonzero(a < threshold) / n * 100, 1)
+
+def nan_to_none(obj):
+    \"\"\"JSON has no NaN — map it to null only at the serialisation boundary.\"\"\"
+    if isinstance(obj, float):
+        return None if math.isnan(obj) else obj
+    if isinstance(obj, dict):
+        return {{k: nan_to_none(v) for k, v in obj.items()}}
+    if isinstance(obj, (list, tuple)):
+        return [nan_to_none(v) for v in obj]
+    return obj
 
-total_hours  = len(temps)
+empty = np.empty(0)
+
+total_hours  = int(temps.size)
 date_range   = f"{{times[0] if times else '?'}} → {{times[-1] if times else '?'}}"
 
 # ── Temperature ──────────────────────────────────────────────────────────────
 ct = clean(temps)
-if ct:
-    t_mean   = round(sum(ct) / len(ct), 2)
-    t_max    = round(max(ct), 2)
-    t_min    = round(min(ct), 2)
-    t_std    = round(statistics.stdev(ct), 2) if len(ct) > 1 else 0.0
+if ct.size:
+    t_mu, t_sigma = mean_std(ct)
+    t_mean   = round(t_mu, 2)
+    t_max    = round(float(np.nanmax(temps)), 2)
+    t_min    = round(float(np.nanmin(temps)), 2)
+    t_std    = round(t_sigma, 2)
     t_miss   = missingness(temps)
     t_roll24 = rolling_avg(temps, 24)
     t_roll7d = rolling_avg(temps, 168)
-    t_anom   = detect_anomalies(temps, times)
+    t_anom   = detect_anomalies(temps, times, t_mu, t_sigma)
     t_dvol   = daily_volatility(temps, times)
     t_cold_pct = pct_hours_below(temps, 10.0)
     t_hot_pct  = pct_hours_above(temps, 35.0)
 else:
     t_mean = t_max = t_min = t_std = 0.0
-    t_miss = 100.0; t_anom = []; t_dvol = []; t_roll24 = []; t_roll7d = []
+    t_miss = 100.0; t_anom = []; t_dvol = []; t_roll24 = t_roll7d = empty
     t_cold_pct = t_hot_pct = 0.0
 
 # ── Precipitation ────────────────────────────────────────────────────────────
 cp = clean(precips)
-if cp:
-    p_total    = round(sum(cp), 2)
-    p_max_hr   = round(max(cp), 2)
+if cp.size:
+    p_total    = round(float(np.nansum(precips)), 2)
+    p_max_hr   = round(float(np.nanmax(precips)), 2)
     p_miss     = missingness(precips)
-    rainy_hrs  = sum(1 for x in cp if x > 0.1)
-    heavy_hrs  = sum(1 for x in cp if x > 2.0)   # construction waterproofing risk
+    rainy_hrs  = int(np.count_nonzero(cp > 0.1))
+    heavy_hrs  = int(np.count_nonzero(cp > 2.0))   # construction waterproofing risk
 else:
     p_total = p_max_hr = 0.0; p_miss = 100.0; rainy_hrs = heavy_hrs = 0
 
 # ── Wind ─────────────────────────────────────────────────────────────────────
 cw = clean(winds)
 cg = clean(gusts)
-if cw:
-    w_mean   = round(sum(cw) / len(cw), 2)
-    w_max    = round(max(cw), 2)
-    w_std    = round(statistics.stdev(cw), 2) if len(cw) > 1 else 0.0
+if cw.size:
+    w_mu, w_sigma = mean_std(cw)
+    w_mean   = round(w_mu, 2)
+    w_max    = round(float(np.nanmax(winds)), 2)
+    w_std    = round(w_sigma, 2)
     w_miss   = missingness(winds)
     w_roll24 = rolling_avg(winds, 24)
-    w_anom   = detect_anomalies(winds, times)
+    w_anom   = detect_anomalies(winds, times, w_mu, w_sigma)
     w_dvol   = daily_volatility(winds, times)
     # Construction risk hours
-    crane_suspended   = sum(1 for x in cw if x > 38)
-    glazing_suspended = sum(1 for x in cw if x > 30)
-    scaffold_caution  = sum(1 for x in cw if x > 25)
+    crane_suspended   = int(np.count_nonzero(cw > 38))
+    glazing_suspended = int(np.count_nonzero(cw > 30))
+    scaffold_caution  = int(np.count_nonzero(cw > 25))
 else:
     w_mean = w_max = w_std = 0.0; w_miss = 100.0
-    w_anom = []; w_dvol = []; w_roll24 = []
+    w_anom = []; w_dvol = []; w_roll24 = empty
     crane_suspended = glazing_suspended = scaffold_caution = 0
 
-g_max = round(max(cg), 2) if cg else None
+g_max = round(float(cg.max()), 2) if cg.size else None
 
 # ── Humidity ─────────────────────────────────────────────────────────────────
 ch = clean(humid)
-h_mean = round(sum(ch) / len(ch), 2) if ch else None
+h_mean = round(float(ch.mean()), 2) if ch.size else None
 
 # ── Print human-readable report ──────────────────────────────────────────────
 print(f"=== SiteWatch Weather Analysis: {{LOCATION}} ===")
@@ -276,8 +364,8 @@ print("── TEMPERATURE (°C) ────────────────
 print(f"  Mean           : {{t_mean}}")
 print(f"  Max / Min      : {{t_max}} / {{t_min}}")
 print(f"  Std Dev (vol.) : {{t_std}}")
-print(f"  24h Rolling Avg: {{t_roll24[-1] if t_roll24 else 'N/A'}} (last window)")
-print(f"  7-day Rolling  : {{t_roll7d[-1] if t_roll7d else 'N/A'}} (last window)")
+print(f"  24h Rolling Avg: {{last(t_roll24)}} (last window)")
+print(f"  7-day Rolling  : {{last(t_roll7d)}} (last window)")
 print(f"  Anomalies      : {{len(t_anom)}} hours > 2σ")
 print(f"  Missingness    : {{t_miss}}%")
 if t_anom:
@@ -297,7 +385,7 @@ print(f"  Mean           : {{w_mean}}")
 print(f"  Max sustained  : {{w_max}}")
 print(f"  Max gust       : {{g_max if g_max is not None else 'N/A'}}")
 print(f"  Std Dev (vol.) : {{w_std}}")
-print(f"  24h Rolling Avg: {{w_roll24[-1] if w_roll24 else 'N/A'}} (last window)")
+print(f"  24h Rolling Avg: {{last(w_roll24)}} (last window)")
 print(f"  Anomalies      : {{len(w_anom)}} hours > 2σ")
 print(f"  Missingness    : {{w_miss}}%")
 if w_anom:
@@ -342,23 +430,21 @@ else:
     print("\\n✓ No operational risk thresholds exceeded in this period.")
 
 # ── Structured JSON output (for LLM consumption) ────────────────────────────
-summary = {{
-    "location": LOCATION,
-    "date_range": date_range,
-    "total_hours": total_hours,
-    "temperature": {{
+summary = make_summary(
+    LOCATION, date_range, total_hours,
+    temperature={{
         "mean_c": t_mean, "max_c": t_max, "min_c": t_min,
         "std_dev": t_std, "missing_pct": t_miss,
         "anomaly_count": len(t_anom),
         "cold_pour_risk_pct": t_cold_pct,
         "heat_pour_risk_pct": t_hot_pct,
     }},
-    "precipitation": {{
+    precipitation={{
         "total_mm": p_total, "peak_mm_per_hr": p_max_hr,
         "rainy_hours": rainy_hrs, "heavy_hours_gt2mm": heavy_hrs,
         "missing_pct": p_miss,
     }},
-    "wind": {{
+    wind={{
         "mean_kmh": w_mean, "max_kmh": w_max, "max_gust_kmh": g_max,
         "std_dev": w_std, "missing_pct": w_miss,
         "anomaly_count": len(w_anom),
@@ -366,16 +452,11 @@ summary = {{
         "glazing_suspended_hrs": glazing_suspended,
         "scaffold_caution_hrs": scaffold_caution,
     }},
-    "humidity": {{"mean_pct": h_mean}},
-    "risk_flags": risk_flags,
-    "overall_risk": ("HIGH" if len(risk_flags) >= 3
-                     else "MEDIUM" if len(risk_flags) >= 1
-                     else "LOW"),
-}}
-print("\\n__JSON_SUMMARY__")
-print(json.dumps(summary))
-print("__END_JSON__")
-print("\\n[Analysis complete]")
+    humidity={{"mean_pct": h_mean}},
+    risk_flags=risk_flags,
+)
+with open(SUMMARY_FILE, "w", encoding="utf-8") as f:
+    json.dump(nan_to_none(summary), f)
 """)
     return script
 
@@ -385,7 +466,8 @@ print("\\n[Analysis complete]")
 def run_code_safely(code: str) -> Dict[str, Any]:
     """
     Execute Python code in a restricted subprocess.
-    Returns: {success, stdout, stderr, timed_out}
+    Returns: {success, stdout, stderr, timed_out, summary}
+    summary is the parsed summary.json the code left in its working dir, or None.
     """
     with tempfile.TemporaryDirectory() as tmpdir:
         script_path = os.path.join(tmpdir, "analysis.py")
@@ -399,9 +481,13 @@ def run_code_safely(code: str) -> Dict[str, Any]:
                 text=True,
                 timeout=SANDBOX_TIMEOUT,
                 cwd=tmpdir,
+                # Still no secrets passed in, but keep the parent's PYTHONPATH so
+                # the child resolves (and reuses compiled bytecode for) the same
+                # packages the parent already has.
                 env={
-                    "PATH": os.environ.get("PATH", ""),
-                    "PYTHONPATH": "",   # isolate from host packages
+                    "PATH":             os.environ.get("PATH", ""),
+                    "PYTHONPATH":       os.environ.get("PYTHONPATH", ""),
+                    "PYTHONUNBUFFERED": "1",
                 },
             )
             return {
@@ -409,6 +495,7 @@ def run_code_safely(code: str) -> Dict[str, Any]:
                 "stdout":    result.stdout,
                 "stderr":    result.stderr,
                 "timed_out": False,
+                "summary":   _read_summary(tmpdir) if result.returncode == 0 else None,
             }
         except subprocess.TimeoutExpired:
             return {
@@ -416,6 +503,7 @@ def run_code_safely(code: str) -> Dict[str, Any]:
                 "stdout":    "",
                 "stderr":    f"Execution timed out after {SANDBOX_TIMEOUT}s",
                 "timed_out": True,
+                "summary":   None,
             }
         except Exception as e:
             return {
@@ -423,16 +511,16 @@ def run_code_safely(code: str) -> Dict[str, Any]:
                 "stdout":    "",
                 "stderr":    str(e),
                 "timed_out": False,
+                "summary":   None,
             }
 
 
-def _parse_json_summary(stdout: str) -> Optional[Dict[str, Any]]:
-    """Extract the structured JSON block from the analysis output."""
+def _read_summary(tmpdir: str) -> Optional[Dict[str, Any]]:
+    """Load the structured summary the analysis script wrote next to itself."""
     try:
-        start = stdout.index("__JSON_SUMMARY__") + len("__JSON_SUMMARY__")
-        end   = stdout.index("__END_JSON__")
-        return json.loads(stdout[start:end].strip())
-    except (ValueError, json.JSONDecodeError):
+        with open(os.path.join(tmpdir, _SUMMARY_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
         return None
 
 
@@ -448,7 +536,7 @@ def analyze_weather(
       1. Geocode location name → lat/lon
       2. Fetch hourly time-series from Open-Meteo (archive or forecast fallback)
       3. Generate + execute analytics script in isolated subprocess
-      4. Parse structured JSON summary
+      4. Load the structured summary.json the script wrote
       5. Return rich result dict
 
     Returns dict with keys:
@@ -482,19 +570,30 @@ def analyze_weather(
             "location": full_name,
         }
 
+    # No hourly records at all → nothing to analyse, don't spawn the sandbox
+    if not weather_data.get("hourly", {}).get("time"):
+        structured = make_summary(full_name, "? → ?", 0)
+        return {
+            "success":    True,
+            "location":   full_name,
+            "latitude":   lat,
+            "longitude":  lon,
+            "start_date": start_date,
+            "end_date":   end_date,
+            "output":     "Insufficient data for analysis",
+            "summary":    structured,
+            "risk_flags": structured["risk_flags"],
+            "overall_risk": structured["overall_risk"],
+            "timed_out":  False,
+        }
+
     # 3. Build + execute analytics
     script = _build_analysis_script(weather_data, full_name)
     result = run_code_safely(script)
 
-    stdout = result["stdout"] if result["success"] else ""
-
-    # 4. Parse JSON summary
-    structured = _parse_json_summary(stdout) if result["success"] else None
-
-    # 5. Build human-readable output (strip the JSON block for display)
-    display_output = stdout
-    if "__JSON_SUMMARY__" in display_output:
-        display_output = display_output[:display_output.index("__JSON_SUMMARY__")].strip()
+    # 4. Structured summary comes from the side-channel file, stdout is pure report
+    structured     = result["summary"]
+    display_output = result["stdout"].strip()
 
     return {
         "success":    result["success"],
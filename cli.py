@@ -18,18 +18,27 @@ Commands:
 """
 import json
 import sys
+import time
+from functools import lru_cache
 from pathlib import Path
 
 import click
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
 from rich.table import Table
 from rich import box
 
+# Markdown / Panel are imported inside the commands that render them, so
+# lightweight commands (stats, sources, delete) skip that import cost.
+
 console = Console()
 
 
+def _fmt_int(n: int) -> str:
+    """Thousands-grouped integer, e.g. 12345 → '12,345'."""
+    return f"{n:,}"
+
+
+@lru_cache(maxsize=4)
 def get_bot(user_id: str = "default"):
     from app.chatbot import Chatbot
     return Chatbot(user_id=user_id)
@@ -57,7 +66,7 @@ def ingest(file_path):
 
     table = Table(show_header=False, box=box.SIMPLE)
     table.add_row("File",             result["file"])
-    table.add_row("Total chars",      f"{result['total_chars']:,}")
+    table.add_row("Total chars",      _fmt_int(result["total_chars"]))
     table.add_row("Total chunks",     str(result["total_chunks"]))
     table.add_row("New chunks added", str(result["new_chunks"]))
     console.print(table)
@@ -82,18 +91,24 @@ def sources():
     table.add_column("Total chars", justify="right")
 
     for s in srcs:
-        table.add_row(s["source"], str(s["chunks"]), f"{s['total_chars']:,}")
+        table.add_row(s["source"], str(s["chunks"]), _fmt_int(s["total_chars"]))
 
     console.print(table)
 
 
 # ── inspect ───────────────────────────────────────────────────────────────
 
+# Above this many chunks, inspect output goes through the terminal pager
+_INSPECT_PAGER_THRESHOLD = 50
+
+
 @cli.command()
 @click.argument("filename")
 @click.option("--full", is_flag=True, help="Show full chunk text (default: truncated)")
 def inspect(filename, full):
     """Show all indexed chunks for a document."""
+    from rich.console import Group
+    from rich.panel import Panel
     from app.rag.file_manager import inspect_source
 
     chunks = inspect_source(filename)
@@ -101,14 +116,33 @@ def inspect(filename, full):
         console.print(f"[red]No chunks found for '{filename}'. Is it indexed?[/red]")
         return
 
-    console.print(f"\n[bold]{filename}[/bold] — {len(chunks)} chunks\n")
-    for c in chunks:
-        text = c["text"] if full else (c["text"][:120] + "..." if len(c["text"]) > 120 else c["text"])
-        console.print(Panel(
-            text,
-            title=f"[dim]chunk {c['chunk_index'] + 1}  |  {c['char_count']} chars[/dim]",
-            border_style="dim",
-        ))
+    if full:
+        rendered = [
+            Panel(
+                c["text"],
+                title=f"[dim]chunk {c['chunk_index'] + 1}  |  {_fmt_int(c['char_count'])} chars[/dim]",
+                border_style="dim",
+            )
+            for c in chunks
+        ]
+    else:
+        # Truncated previews fit one grid — far cheaper to lay out than N panels
+        table = Table(box=box.SIMPLE, show_header=True)
+        table.add_column("Chunk", justify="right", style="dim")
+        table.add_column("Chars", justify="right", style="dim")
+        table.add_column("Text")
+        for c in chunks:
+            text = c["text"][:120] + "..." if len(c["text"]) > 120 else c["text"]
+            table.add_row(str(c["chunk_index"] + 1), _fmt_int(c["char_count"]), text)
+        rendered = [table]
+
+    # One render + one write for the whole list; page long documents
+    body = Group(f"\n[bold]{filename}[/bold] — {len(chunks)} chunks\n", *rendered)
+    if len(chunks) > _INSPECT_PAGER_THRESHOLD:
+        with console.pager(styles=True):
+            console.print(body)
+    else:
+        console.print(body)
 
 
 # ── delete ────────────────────────────────────────────────────────────────
@@ -148,7 +182,7 @@ def reindex(file_path):
     table.add_row("File",         result["source"])
     table.add_row("Deleted",      str(result["deleted"]))
     table.add_row("New chunks",   str(result["new_chunks"]))
-    table.add_row("Total chars",  f"{result['total_chars']:,}")
+    table.add_row("Total chars",  _fmt_int(result["total_chars"]))
     console.print(table)
     console.print("[green]✓ Re-index complete[/green]")
 
@@ -164,7 +198,7 @@ def stats():
     table = Table(title="Knowledge Base Stats", box=box.ROUNDED, show_header=False)
     table.add_row("Total documents", str(s["total_sources"]))
     table.add_row("Total chunks",    str(s["total_chunks"]))
-    table.add_row("Total chars",     f"{s['total_chars']:,}")
+    table.add_row("Total chars",     _fmt_int(s["total_chars"]))
     table.add_row("Avg chunk size",  f"{s['avg_chunk_chars']} chars")
     console.print(table)
 
@@ -174,11 +208,17 @@ def stats():
 
 # ── chat (streaming) ──────────────────────────────────────────────────────
 
+# Token flush cadence for streamed answers (40 ms is imperceptible)
+_STREAM_FLUSH_SECS = 0.04
+
+
 @cli.command()
 @click.option("--user-id", default="default", help="User namespace for multi-user mode")
 @click.option("--no-stream", is_flag=True, help="Disable streaming (use buffered output)")
 def chat(user_id, no_stream):
     """Start an interactive streaming chat session."""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
     bot = get_bot(user_id)
 
     mode = "buffered" if no_stream else "streaming"
@@ -226,14 +266,23 @@ def chat(user_id, no_stream):
             console.print(Markdown(result["answer"]))
             _print_turn_footer(result)
         else:
-            # Streaming output
+            # Streaming output — coalesce tokens and flush at most every
+            # _STREAM_FLUSH_SECS (or on newline) instead of once per token
             final = None
+            buf, last = [], time.monotonic()
             for event in bot.stream_chat(user_input):
                 if event["type"] == "token":
-                    print(event["content"], end="", flush=True)
+                    buf.append(event["content"])
+                    now = time.monotonic()
+                    if now - last > _STREAM_FLUSH_SECS or "\n" in event["content"]:
+                        sys.stdout.write("".join(buf))
+                        sys.stdout.flush()
+                        buf.clear()
+                        last = now
                 elif event["type"] == "done":
                     final = event
-            print()  # newline after stream
+            sys.stdout.write("".join(buf) + "\n")  # remainder + newline after stream
+            sys.stdout.flush()
             if final:
                 _print_turn_footer(final)
 
@@ -254,6 +303,8 @@ def _print_turn_footer(result: dict):
 
 
 def _weather_wizard(bot):
+    from rich.markdown import Markdown
+    from rich.panel import Panel
     console.print("\n[bold yellow]🌤 Weather Analysis[/bold yellow]")
     location   = console.input("Location: ").strip()
     start_date = console.input("Start date (YYYY-MM-DD): ").strip()
@@ -309,6 +360,8 @@ def _show_history(bot):
 @cli.command()
 def memory():
     """Display current USER_MEMORY.md and COMPANY_MEMORY.md."""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
     from app.config import USER_MEMORY_FILE, COMPANY_MEMORY_FILE
     for label, path in [("User Memory", USER_MEMORY_FILE), ("Company Memory", COMPANY_MEMORY_FILE)]:
         if path.exists():
@@ -325,6 +378,8 @@ def memory():
 @click.option("--end-date",   default="2024-01-31")
 def weather(location, start_date, end_date):
     """Run a weather time-series analysis."""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
     bot = get_bot()
     with console.status("Analyzing..."):
         result = bot.analyze_weather(location, start_date, end_date)
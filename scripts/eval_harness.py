@@ -17,20 +17,31 @@ Run: python scripts/eval_harness.py
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
+import re
 import sys
 import time
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from typing import List, Optional, Callable
 
+try:
+    import orjson
+
+    def _dumps(obj, indent: bool = True) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+except ImportError:  # orjson is optional — fall back to the stdlib encoder
+    def _dumps(obj, indent: bool = True) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, default=asdict).encode("utf-8")
+
 ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
 
 
 # ── Test case schema ──────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class TestCase:
     id: str
     category: str          # "rag" | "refusal" | "memory" | "injection"
@@ -42,9 +53,11 @@ class TestCase:
     expect_refusal: bool = False        # should bot say "not in documents"?
     expect_injection_flag: bool = False # should injection be detected?
     memory_fact: Optional[str] = None  # phrase to look for in memory file
+    # (name, fn) pairs for `checks`, resolved once against CHECK_FUNCTIONS at import
+    _resolved: List[tuple[str, Callable]] = field(default_factory=list, init=False, repr=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     id: str
     category: str
@@ -176,6 +189,10 @@ REFUSAL_PHRASES = [
     "not present", "does not contain", "no mention",
 ]
 
+# All phrases in one case-insensitive alternation — a single scan of the raw
+# answer in the C regex engine, with no lowercased copy and no per-phrase loop
+_REFUSAL_RE = re.compile("|".join(map(re.escape, REFUSAL_PHRASES)), re.IGNORECASE)
+
 
 def check_has_citations(result: dict) -> tuple[bool, str]:
     ok = len(result.get("citations", [])) > 0
@@ -195,10 +212,9 @@ def check_answer_not_empty(result: dict) -> tuple[bool, str]:
 
 
 def check_contains_refusal_phrase(result: dict) -> tuple[bool, str]:
-    answer = result.get("answer", "").lower()
-    found = [p for p in REFUSAL_PHRASES if p in answer]
+    found = {m.lower() for m in _REFUSAL_RE.findall(result.get("answer", ""))}
     ok = len(found) > 0
-    return ok, f"Refusal phrases found: {found}"
+    return ok, f"Refusal phrases found: {sorted(found)}"
 
 
 def check_injection_flagged(result: dict) -> tuple[bool, str]:
@@ -221,12 +237,114 @@ CHECK_FUNCTIONS: dict[str, Callable] = {
     "not_hacked":                  check_not_hacked,
 }
 
+# Resolve check names up front — a typo in TEST_CASES fails at import (KeyError)
+# instead of showing up as an UNKNOWN check mid-run
+for _tc in TEST_CASES:
+    _tc._resolved = [(name, CHECK_FUNCTIONS[name]) for name in _tc.checks]
+
 
 # ── Runner ────────────────────────────────────────────────────────────────
 
+# (st_mtime_ns, st_size, content) of the last USER_MEMORY_FILE read
+_mem_cache: tuple[int, int, str] | None = None
+
+
+def _read_user_memory() -> str:
+    """Read USER_MEMORY_FILE, reusing the last content while the file is unchanged."""
+    global _mem_cache
+    from app.config import USER_MEMORY_FILE
+    try:
+        st = USER_MEMORY_FILE.stat()
+    except FileNotFoundError:
+        return ""
+    if _mem_cache and _mem_cache[:2] == (st.st_mtime_ns, st.st_size):
+        return _mem_cache[2]
+    content = USER_MEMORY_FILE.read_text()
+    _mem_cache = (st.st_mtime_ns, st.st_size, content)
+    return content
+
+
+async def _run_case(bot, tc: TestCase) -> tuple[dict, int, str]:
+    """
+    Run one test case off the event loop.
+    Returns (chat_result, latency_ms, memory_content) — the memory file is
+    snapshotted right after the turn so later turns can't affect the check.
+    """
+    t0 = time.perf_counter_ns()
+    chat_result = await bot.achat(tc.question)
+    latency_ms = (time.perf_counter_ns() - t0) // 1_000_000
+
+    mem_content = _read_user_memory() if tc.memory_fact else ""
+    return chat_result, latency_ms, mem_content
+
+
+def _score_case(
+    tc: TestCase, chat_result: dict, latency_ms: int, mem_content: str,
+) -> tuple[TestResult, List[str]]:
+    """Apply the case's checks (and memory check) to a chat result."""
+    checks_passed = []
+    checks_failed = []
+    check_notes = []
+
+    for check_name, fn in tc._resolved:
+        ok, note = fn(chat_result)
+        if ok:
+            checks_passed.append(check_name)
+        else:
+            checks_failed.append(check_name)
+        check_notes.append(f"  {('✓' if ok else '✗')} {check_name}: {note}")
+
+    # Memory check (post-turn)
+    if tc.memory_fact:
+        memory_ok = tc.memory_fact.lower() in mem_content.lower()
+        note = f"  {'✓' if memory_ok else '✗'} memory_contains '{tc.memory_fact}'"
+        check_notes.append(note)
+        if memory_ok:
+            checks_passed.append("memory_written")
+        else:
+            checks_failed.append("memory_written")
+
+    total_checks = len(checks_passed) + len(checks_failed)
+    score = len(checks_passed) / total_checks if total_checks > 0 else 0.0
+
+    result = TestResult(
+        id=tc.id,
+        category=tc.category,
+        question=tc.question,
+        passed=score == 1.0,
+        score=score,
+        checks_passed=checks_passed,
+        checks_failed=checks_failed,
+        answer_snippet=chat_result.get("answer", "")[:150],
+        citations=chat_result.get("citations", []),
+        hallucinated=chat_result.get("hallucinated_citations", []),
+        notes="\n".join(check_notes),
+        latency_ms=latency_ms,
+    )
+    return result, check_notes
+
+
+def _write_report(path: Path, report: dict) -> None:
+    """
+    Stream the report to disk: the summary fields first, then one serialised
+    TestResult per line, so no single encoded copy of the whole report exists.
+    """
+    with path.open("wb") as fp:
+        fp.write(b"{\n")
+        for key, value in report.items():
+            if key != "results":
+                fp.write(b"  %s: %s,\n" % (_dumps(key, indent=False), _dumps(value, indent=False)))
+        fp.write(b'  "results": [')
+        for i, r in enumerate(report["results"]):
+            fp.write(b",\n    " if i else b"\n    ")
+            fp.write(_dumps(r, indent=False))
+        fp.write(b"\n  ]\n}\n")
+
+
 def run_eval(save_report: bool = False) -> dict:
     from app.chatbot import Chatbot
     from rich.console import Console
+    from rich.live import Live
     from rich.table import Table
     from rich import box
 
@@ -237,77 +355,99 @@ def run_eval(save_report: bool = False) -> dict:
 
     bot = Chatbot()
 
-    # Ingest both sample docs
+    # Ingest both sample docs (one batched embedding pass), skipping any that
+    # are unchanged since the last ingest and still in the index
+    from app.rag.ingestion import IngestManifest
+    manifest = IngestManifest()
+    indexed = set(bot.list_sources())
+
+    pending = []
     for doc in ["sample.txt", "injection_test.txt"]:
         path = ROOT / "sample_docs" / doc
-        if path.exists():
-            result = bot.ingest(str(path))
-            console.print(f"[dim]Ingested {doc}: {result['total_chunks']} chunks[/dim]")
+        if not path.exists():
+            continue
+        if manifest.unchanged(path, indexed):
+            console.print(f"[dim]Unchanged, skipping ingest: {path.name}[/dim]")
+            continue
+        pending.append(path)
+
+    if pending:
+        for path, result in zip(pending, bot.ingest_many([str(p) for p in pending])):
+            manifest.record(path, result)
+            console.print(f"[dim]Ingested {result['file']}: {result['total_chunks']} chunks[/dim]")
+        manifest.save()
+
+    # Pre-warm the query-embedding cache so the timed loop measures LLM +
+    # retrieval latency, not first-time model encodes
+    for tc in TEST_CASES:
+        bot.embed_query_cached(tc.question)
+
+    console.print()
 
+    # Non-memory cases are I/O-bound — run them concurrently, each on its own
+    # Chatbot so no case's prompt picks up another's conversation history.
+    # Memory cases run afterwards, one at a time on the shared bot, so the
+    # USER_MEMORY_FILE check after each turn only sees that turn's write.
+    parallel = [tc for tc in TEST_CASES if not tc.memory_fact]
+    serial   = [tc for tc in TEST_CASES if tc.memory_fact]
+
+    # Live progress table — rows appear in completion order. "Done at" is
+    # measured from submission, so Done at − Latency ≈ time spent queued.
+    progress = Table(title="Eval Progress", box=box.SIMPLE, show_header=True)
+    progress.add_column("Case",     style="cyan")
+    progress.add_column("Category")
+    progress.add_column("Result")
+    progress.add_column("Latency",  justify="right")
+    progress.add_column("Done at",  justify="right")
+
+    scored: dict[str, tuple[TestResult, List[str]]] = {}
+    t_submit = time.perf_counter_ns()
+
+    def _record(tc: TestCase, outcome) -> None:
+        if isinstance(outcome, BaseException):
+            result, check_notes = _score_case(tc, {"answer": ""}, 0, "")
+            check_notes.append(f"  ✗ error: {outcome!r}")
+        else:
+            result, check_notes = _score_case(tc, *outcome)
+        scored[tc.id] = (result, check_notes)
+
+        done_ms = (time.perf_counter_ns() - t_submit) // 1_000_000
+        status = "[green]PASS[/green]" if result.passed else "[red]FAIL[/red]"
+        progress.add_row(tc.id, tc.category, f"{status} ({result.score:.0%})",
+                         f"{result.latency_ms}ms", f"{done_ms}ms")
+
+    async def _tagged(tc: TestCase, case_bot):
+        try:
+            return tc, await _run_case(case_bot, tc)
+        except Exception as exc:
+            return tc, exc
+
+    async def _run_all(live) -> None:
+        isolated = [_tagged(tc, Chatbot()) for tc in parallel]
+        for next_done in asyncio.as_completed(isolated):
+            _record(*await next_done)
+            live.refresh()
+        for tc in serial:
+            _record(*await _tagged(tc, bot))
+            live.refresh()
+
+    console.print(f"[bold]Running {len(TEST_CASES)} cases "
+                  f"({len(parallel)} concurrent, {len(serial)} serial)…[/bold]\n")
+    with Live(progress, console=console, refresh_per_second=4) as live:
+        asyncio.run(_run_all(live))
     console.print()
 
     results: List[TestResult] = []
     by_category: dict[str, list] = {}
 
     for tc in TEST_CASES:
-        console.print(f"[bold]Running:[/bold] [{tc.id}] {tc.description}")
-
-        t0 = time.time()
-        chat_result = bot.chat(tc.question)
-        latency_ms = int((time.time() - t0) * 1000)
-
-        checks_passed = []
-        checks_failed = []
-        check_notes = []
-
-        for check_name in tc.checks:
-            fn = CHECK_FUNCTIONS.get(check_name)
-            if fn is None:
-                checks_failed.append(f"{check_name}(UNKNOWN)")
-                continue
-            ok, note = fn(chat_result)
-            if ok:
-                checks_passed.append(check_name)
-            else:
-                checks_failed.append(check_name)
-            check_notes.append(f"  {('✓' if ok else '✗')} {check_name}: {note}")
-
-        # Memory check (post-turn)
-        memory_ok = True
-        if tc.memory_fact:
-            from app.config import USER_MEMORY_FILE
-            mem_content = USER_MEMORY_FILE.read_text() if USER_MEMORY_FILE.exists() else ""
-            memory_ok = tc.memory_fact.lower() in mem_content.lower()
-            note = f"  {'✓' if memory_ok else '✗'} memory_contains '{tc.memory_fact}'"
-            check_notes.append(note)
-            if memory_ok:
-                checks_passed.append("memory_written")
-            else:
-                checks_failed.append("memory_written")
-
-        total_checks = len(checks_passed) + len(checks_failed)
-        score = len(checks_passed) / total_checks if total_checks > 0 else 0.0
-        passed = score == 1.0
-
-        result = TestResult(
-            id=tc.id,
-            category=tc.category,
-            question=tc.question,
-            passed=passed,
-            score=score,
-            checks_passed=checks_passed,
-            checks_failed=checks_failed,
-            answer_snippet=chat_result.get("answer", "")[:150],
-            citations=chat_result.get("citations", []),
-            hallucinated=chat_result.get("hallucinated_citations", []),
-            notes="\n".join(check_notes),
-            latency_ms=latency_ms,
-        )
+        result, check_notes = scored[tc.id]
         results.append(result)
         by_category.setdefault(tc.category, []).append(result)
 
-        status = "[green]PASS[/green]" if passed else "[red]FAIL[/red]"
-        console.print(f"  {status} ({score:.0%}) | {latency_ms}ms")
+        console.print(f"[bold]Case:[/bold] [{tc.id}] {tc.description}")
+        status = "[green]PASS[/green]" if result.passed else "[red]FAIL[/red]"
+        console.print(f"  {status} ({result.score:.0%}) | {result.latency_ms}ms")
         for note in check_notes:
             color = "green" if "✓" in note else "red"
             console.print(f"  [{color}]{note}[/{color}]")
@@ -322,20 +462,30 @@ def run_eval(save_report: bool = False) -> dict:
     table.add_column("Avg Latency",width=12)
 
     total_pass = total_fail = 0
+    total_score = 0.0
     category_scores = {}
 
     for cat, cat_results in by_category.items():
-        passed_n = sum(1 for r in cat_results if r.passed)
-        failed_n = len(cat_results) - passed_n
-        cat_score = sum(r.score for r in cat_results) / len(cat_results)
-        avg_lat = int(sum(r.latency_ms for r in cat_results) / len(cat_results))
+        # One pass per category for pass count, score sum and latency sum
+        passed_n = 0
+        score_sum = 0.0
+        lat_sum = 0
+        for r in cat_results:
+            passed_n += r.passed
+            score_sum += r.score
+            lat_sum += r.latency_ms
+        n = len(cat_results)
+        failed_n = n - passed_n
+        cat_score = score_sum / n
+        avg_lat = lat_sum // n
         total_pass += passed_n
         total_fail += failed_n
+        total_score += score_sum
         category_scores[cat] = cat_score
         table.add_row(cat, str(passed_n), str(failed_n),
                       f"{cat_score:.0%}", f"{avg_lat}ms")
 
-    overall = sum(r.score for r in results) / len(results) if results else 0
+    overall = total_score / len(results) if results else 0
     table.add_row("─" * 10, "─" * 4, "─" * 4, "─" * 6, "─" * 10)
     table.add_row("[bold]TOTAL[/bold]",
                   f"[bold]{total_pass}[/bold]",
@@ -357,14 +507,14 @@ def run_eval(save_report: bool = False) -> dict:
         "passed":           total_pass,
         "failed":           total_fail,
         "category_scores":  {k: round(v, 3) for k, v in category_scores.items()},
-        "results":          [asdict(r) for r in results],
+        "results":          results,   # TestResult dataclasses; _dumps serialises them
     }
 
     if save_report:
         from app.config import ARTIFACTS_DIR
         ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
         report_path = ARTIFACTS_DIR / "eval_report.json"
-        report_path.write_text(json.dumps(report, indent=2))
+        _write_report(report_path, report)
         console.print(f"[dim]Report saved: {report_path}[/dim]")
 
     return report
@@ -7,8 +7,15 @@ Run: streamlit run web_app.py
 """
 import streamlit as st
 from pathlib import Path
-from typing import List
-import tempfile, os
+from typing import List, Tuple
+import hashlib, html, json, logging, os, re, sys, tempfile, shutil, threading, time
+from collections import OrderedDict, deque
+
+from app.config import RAG_ANSWER_CACHE, RAG_INSTRUMENT, RAG_WARMUP
+from app.intelligence import SiteWatch
+from app.llm.client import LLMClient
+from app.rag.ingestion import ingest_file, ingest_files, get_chunk_count, get_collection, get_embed_model
+from app.rag.file_manager import list_sources, delete_source
 
 st.set_page_config(
     page_title="SiteWatch — Site Intelligence",
@@ -17,87 +24,127 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-st.markdown("""
-<style>
-/* ── App-level background ── */
-section.main > div { background: #0f1117; }
-
-/* ── Risk banners ── */
-.risk-low      { padding:12px 20px; border-radius:8px; font-weight:700; font-size:15px;
-                 background:#052e16; color:#86efac; border-left:5px solid #22c55e; margin:10px 0; }
-.risk-medium   { padding:12px 20px; border-radius:8px; font-weight:700; font-size:15px;
-                 background:#451a03; color:#fcd34d; border-left:5px solid #f59e0b; margin:10px 0; }
-.risk-high     { padding:12px 20px; border-radius:8px; font-weight:700; font-size:15px;
-                 background:#450a0a; color:#fca5a5; border-left:5px solid #ef4444; margin:10px 0; }
-.risk-critical { padding:12px 20px; border-radius:8px; font-weight:700; font-size:15px;
-                 background:#4c0519; color:#fecdd3; border-left:5px solid #e11d48; margin:10px 0;
-                 animation: pulse 1.5s infinite; }
-@keyframes pulse { 0%,100% { opacity:1; } 50% { opacity:0.75; } }
-.risk-unknown  { padding:12px 20px; border-radius:8px; font-weight:700; font-size:15px;
-                 background:#1e293b; color:#94a3b8; border-left:5px solid #475569; margin:10px 0; }
-
-/* ── Evidence source pills ── */
-.src-pill { display:inline-block; padding:4px 12px; border-radius:99px;
-            font-size:11px; font-weight:700; margin:2px 3px 2px 0; letter-spacing:0.3px; }
-.src-rag  { background:#1e3a5f; color:#93c5fd; border:1px solid #2563eb; }
-.src-wx   { background:#422006; color:#fcd34d; border:1px solid #d97706; }
-.src-mem  { background:#14532d; color:#86efac; border:1px solid #16a34a; }
-
-/* ── Loading stage indicators ── */
-.stage-done   { color:#22c55e; font-weight:600; font-size:13px; }
-.stage-active { color:#f59e0b; font-weight:600; font-size:13px; }
-
-/* ── Memory card ── */
-.mem-card { background:#1e293b; border:1px solid #334155; border-radius:10px;
-            padding:12px 16px; margin-top:4px; }
-.mem-item { font-size:12px; color:#cbd5e1; margin:4px 0; padding-left:8px;
-            border-left:2px solid #3b82f6; }
-.mem-role { font-size:13px; font-weight:700; color:#e2e8f0; margin-bottom:6px; }
-
-/* ── Header strip ── */
-.site-header { background: linear-gradient(135deg, #1e3a5f 0%, #0f2027 100%);
-               border-radius:12px; padding:18px 24px; margin-bottom:16px;
-               border:1px solid #1d4ed8; }
-.site-header h2 { margin:0; color:#e2e8f0; font-size:22px; }
-.site-header p  { margin:4px 0 0; color:#94a3b8; font-size:13px; }
-
-/* ── Index status badge ── */
-.indexed-badge { display:inline-block; background:#14532d; color:#86efac;
-                 border:1px solid #16a34a; border-radius:99px;
-                 padding:2px 10px; font-size:11px; font-weight:700; margin-left:6px; }
-.not-indexed-badge { display:inline-block; background:#450a0a; color:#fca5a5;
-                     border:1px solid #dc2626; border-radius:99px;
-                     padding:2px 10px; font-size:11px; font-weight:700; margin-left:6px; }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False)
+def _css() -> str:
+    # Read once per process; edit static/sitewatch.css, not this file
+    return (Path(__file__).parent / "static" / "sitewatch.css").read_text(encoding="utf-8")
+
+st.markdown(f"<style>{_css()}</style>", unsafe_allow_html=True)
 
 # ══ Session init ══════════════════════════════════════════════════════════════
-for k, v in {"messages": [], "user_id": "default", "sw": None,
-              "indexed_files": set(), "startup_done": False}.items():
+for k, v in {"messages": [], "sw": None, "user_id": "default",
+              "indexed_files": set()}.items():
     if k not in st.session_state:
         st.session_state[k] = v
 
-def get_sw():
-    from app.intelligence import SiteWatch
+@st.cache_resource(show_spinner=False)
+def _llm_client() -> LLMClient:
+    # Stateless Groq wrapper: one per process. SiteWatch itself holds the
+    # conversation history, so it stays per session.
+    return LLMClient()
+
+def get_sw() -> SiteWatch:
     uid = st.session_state.user_id
-    if st.session_state.sw is None or getattr(st.session_state.sw, "user_id", None) != uid:
-        st.session_state.sw = SiteWatch(user_id=uid)
+    if st.session_state.sw is None or st.session_state.sw.user_id != uid:
+        st.session_state.sw = SiteWatch(user_id=uid, llm=_llm_client())
     return st.session_state.sw
 
+# ══ Startup: warm the embedding model off the request path ════════════════
+def _warmup():
+    try:
+        get_collection()
+        get_embed_model().encode(["warmup"], show_progress_bar=False)
+    except Exception:
+        pass
+
+@st.cache_resource(show_spinner=False)
+def _start_warmup() -> bool:
+    # cache_resource → one thread per process, not one per rerun
+    threading.Thread(target=_warmup, name="sitewatch-warmup", daemon=True).start()
+    return True
+
+if RAG_WARMUP:
+    _start_warmup()
+
 # ══ Startup: auto-ingest sample handbook if nothing is indexed yet ══════════
-if not st.session_state.startup_done:
-    st.session_state.startup_done = True
-    from app.rag.ingestion import ingest_file, get_chunk_count
+@st.cache_resource(show_spinner=False)
+def _ensure_sample_indexed(path_str: str, mtime: float, size: int) -> bool:
+    # Keyed on (mtime, size) so it runs once per process, and again if the file
+    # is edited. A failed ingest raises, and cache_resource does not cache
+    # exceptions, so the next session retries instead of staying empty
     if get_chunk_count() == 0:
-        sample_dir = Path(__file__).parent / "sample_docs"
-        auto_ingest = ["sitewatch_handbook.txt"]
-        for fname in auto_ingest:
-            p = sample_dir / fname
-            if p.exists():
-                try:
-                    ingest_file(p)
-                except Exception:
-                    pass
+        ingest_file(Path(path_str))
+    return True
+
+_sample = Path(__file__).parent / "sample_docs" / "sitewatch_handbook.txt"
+if _sample.exists():
+    _st = _sample.stat()
+    try:
+        _ensure_sample_indexed(str(_sample), _st.st_mtime, _st.st_size)
+    except Exception:
+        pass
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _list_sources():
+    return list_sources()
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    # (st_mtime_ns, st_size): float st_mtime can miss two writes in one tick
+    try:
+        info = path.stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (info.st_mtime_ns, info.st_size)
+
+# "- [2026-02-19 04:02] (confidence: 0.95) <fact>" → "<fact>"
+_MEM_RE = re.compile(
+    r"^-\s*(?:\[[^\]]*\]\s*)?(?:\(confidence[^)]*\)\s*)?(?P<body>.*?)\s*(?:\(confidence[^)]*\))?$"
+)
+
+_MEM_TAIL_BYTES = 16 * 1024
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _load_mem_bullets(path_str: str, stamp: Tuple[int, int], tail: int) -> List[str]:
+    """Last `tail` bullets of a memory file as HTML-safe fact text.
+    `stamp` is only part of the cache key — a memory write invalidates it."""
+    p = Path(path_str)
+    if not p.exists():
+        return []
+    # Memory files are append-only, so the bullets we show sit at the end:
+    # parse only the last block and fall back to a full scan if it is short
+    with open(p, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - _MEM_TAIL_BYTES))
+        lines = f.read().decode("utf-8", "ignore").splitlines()
+        if size > _MEM_TAIL_BYTES:
+            lines = lines[1:]          # first line may be cut mid-way
+        items = deque((l.strip() for l in lines if l.strip().startswith("-")), maxlen=tail)
+        if len(items) < tail and size > _MEM_TAIL_BYTES:
+            f.seek(0)
+            items = deque((l.strip() for l in (b.decode("utf-8", "ignore") for b in f)
+                           if l.strip().startswith("-")), maxlen=tail)
+    return [html.escape(_MEM_RE.match(l).group("body")) for l in items]
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _render_memory_html(mem_path: str, mem_stamp: Tuple[int, int],
+                        co_path: str, co_stamp: Tuple[int, int]) -> str:
+    """The whole Site Profile memory block as one HTML string ("" if there are
+    no memories). Keyed on both files' stamps, so reruns reuse the built blob."""
+    mem_items = _load_mem_bullets(mem_path, mem_stamp, 5)  # last 5 facts
+    co_items  = _load_mem_bullets(co_path,  co_stamp,  3)
+    if not (mem_items or co_items):
+        return ""
+    parts = ['<div style="font-size:12px; color:#64748b; margin:6px 0 4px;">'
+             '🧠 <b>Persistent memory active</b> — SiteWatch remembers context across sessions.'
+             '</div>']
+    # Concise bullet points only
+    if mem_items:
+        parts.append('<div class="mem-card"><div class="mem-role">👤 Your Profile</div>' +
+                     "".join(f'<div class="mem-item">{i}</div>' for i in mem_items) + '</div>')
+    if co_items:
+        parts.append('<div class="mem-card" style="margin-top:8px;"><div class="mem-role">🏢 Site Context</div>' +
+                     "".join(f'<div class="mem-item">{i}</div>' for i in co_items) + '</div>')
+    return "".join(parts)
 
 RISK_STYLE = {
     "LOW":      ("risk-low",      "🟢 Site Risk: LOW — Full operations"),
@@ -106,6 +153,157 @@ RISK_STYLE = {
     "CRITICAL": ("risk-critical", "⛔ Site Risk: CRITICAL — Site stand-down"),
     "UNKNOWN":  ("risk-unknown",  "⬜ Risk level not determined"),
 }
+# Rendered once at import; the history loop just looks the banner up
+RISK_STYLE_HTML = {k: f'<div class="{cls}">{label}</div>' for k, (cls, label) in RISK_STYLE.items()}
+
+PILL_RAG     = '<span class="src-pill src-rag">📖 Handbook</span>'
+PILL_MEM     = '<span class="src-pill src-mem">🧠 Profile</span>'
+PILL_WX_TMPL = '<span class="src-pill src-wx">🌤 {}</span>'
+
+def _evidence_html(rag: bool, weather: bool, weather_location, memory: bool,
+                   citations: List[str], hallucinated: List[str]) -> str:
+    """Source pills, citation line and removed-citation warning as one HTML
+    block, so each assistant turn costs a single st.markdown delta."""
+    parts: List[str] = []
+    pills = ""
+    if rag:
+        pills += PILL_RAG
+    if weather:
+        pills += PILL_WX_TMPL.format(html.escape(weather_location or "Weather"))
+    if memory:
+        pills += PILL_MEM
+    if pills:
+        parts.append(f'<div style="margin-top:8px">{pills}</div>')
+    if citations:
+        parts.append('<div class="cite-line">📎 ' +
+                     " · ".join(html.escape(c) for c in citations) + '</div>')
+    if hallucinated:
+        parts.append('<div class="warn-box">🔍 ⚠️ Removed unverifiable citations: ' +
+                     html.escape(", ".join(hallucinated)) + '</div>')
+    return "\n".join(parts)
+
+class _WeatherRawStore:
+    """Process-wide id → raw weather text. Chat history keeps only the id, so
+    each session's messages stay small; oldest entries drop past `maxsize`."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, raw: str) -> str:
+        wx_id = hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+        with self._lock:
+            self._entries[wx_id] = raw
+            self._entries.move_to_end(wx_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return wx_id
+
+    def get(self, wx_id: str):
+        with self._lock:
+            return self._entries.get(wx_id)
+
+@st.cache_resource(show_spinner=False)
+def _weather_raw_store() -> _WeatherRawStore:
+    return _WeatherRawStore()
+
+class _AnswerCache:
+    """Process-wide key → (streamed text, FusionResult) with a short TTL, shared
+    across sessions so a re-clicked example or retyped question is instant."""
+
+    def __init__(self, maxsize: int = 128, ttl_seconds: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: tuple) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+@st.cache_resource(show_spinner=False)
+def _answer_cache() -> _AnswerCache:
+    return _AnswerCache()
+
+def _replay(streamed: str, result):
+    """A cached answer in stream_query's event shape: all text, then done."""
+    yield {"type": "token", "content": streamed}
+    yield {"type": "done", "result": result}
+
+@st.fragment
+def _handbook_panel():
+    """Uploader + indexed-source list. A fragment, so an upload or a delete
+    reruns just this panel instead of the chat, memory cards and footer."""
+    uploaded = st.file_uploader(
+        "Drop PDF/TXT/HTML — auto-indexed instantly",
+        type=["pdf", "txt", "html", "md"],
+        accept_multiple_files=True,
+        label_visibility="collapsed",
+    )
+    # Auto-index on drop (no button needed) — all new files in one batch
+    pending = [f for f in uploaded or [] if f.name not in st.session_state.indexed_files]
+    if pending:
+        tmp_paths: List[str] = []
+        try:
+            for f in pending:
+                with tempfile.NamedTemporaryFile(
+                    delete=False, suffix=Path(f.name).suffix
+                ) as tmp:
+                    shutil.copyfileobj(f, tmp, length=1 << 20)
+                    tmp_paths.append(tmp.name)
+            names = [f.name for f in pending]
+            label = names[0] if len(names) == 1 else f"{len(names)} files"
+            with st.spinner(f"📥 Indexing {label}…"):
+                results = ingest_files(tmp_paths, original_names=names)
+            st.session_state.indexed_files.update(names)
+            _list_sources.clear()
+            for r in results:
+                st.success(f"✅ **{r['file']}** — {r['total_chunks']} chunks indexed ({r['new_chunks']} new)")
+            st.rerun(scope="fragment")
+        except Exception as e:
+            st.error(str(e))
+        finally:
+            for tmp_path in tmp_paths:
+                Path(tmp_path).unlink(missing_ok=True)
+
+    # Show indexed sources
+    srcs = _list_sources()
+    if srcs:
+        for s in srcs:
+            c1, c2 = st.columns([5, 1])
+            c1.markdown(
+                f'<span class="indexed-badge">✓ indexed</span> '
+                f'<span style="font-size:12px; color:#cbd5e1;">{s["source"]}</span> '
+                f'<span style="font-size:11px; color:#475569;">({s["chunks"]} chunks)</span>',
+                unsafe_allow_html=True,
+            )
+            if c2.button("✕", key=f"rm_{s['source']}", help="Remove from index"):
+                delete_source(s["source"])
+                _list_sources.clear()
+                st.rerun(scope="fragment")
+    else:
+        st.markdown(
+            '<span class="not-indexed-badge">no handbook indexed</span><br>'
+            '<span style="font-size:11px; color:#64748b;">Upload a handbook above or the sample '
+            '<code>sitewatch_handbook.txt</code> to enable citation-grounded answers.</span>',
+            unsafe_allow_html=True,
+        )
 
 # ══════════════════════════════════════════════════════════════════════════════
 # SIDEBAR
@@ -135,101 +333,18 @@ with st.sidebar:
         sw_instance = get_sw()
         mem_path = sw_instance._user_mem_file
         co_path  = sw_instance._company_mem_file
-        mem_text = mem_path.read_text(encoding="utf-8") if mem_path.exists() else ""
-        co_text  = co_path.read_text(encoding="utf-8")  if co_path.exists()  else ""
-        has_mem  = bool(mem_text) and "_No memories" not in mem_text
-        has_co   = bool(co_text)  and "_No memories" not in co_text
-
-        if has_mem or has_co:
-            st.markdown("""
-            <div style="font-size:12px; color:#64748b; margin:6px 0 4px;">
-            🧠 <b>Persistent memory active</b> — SiteWatch remembers context across sessions.
-            </div>""", unsafe_allow_html=True)
-
-            # User memory card — show concise bullet points only
-            if has_mem:
-                items = [l.strip() for l in mem_text.splitlines()
-                         if l.strip().startswith("-")][-5:]  # last 5 facts
-                if items:
-                    html_items = "".join(
-                        f'<div class="mem-item">{"  ".join(i.split("]")[-1].strip().split("(confidence")[0].strip() for _ in [1])}</div>'
-                        for i in items
-                    )
-                    st.markdown(
-                        f'<div class="mem-card">'
-                        f'<div class="mem-role">👤 Your Profile</div>'
-                        f'{html_items}</div>',
-                        unsafe_allow_html=True,
-                    )
-            if has_co:
-                co_items = [l.strip() for l in co_text.splitlines()
-                            if l.strip().startswith("-")][-3:]
-                if co_items:
-                    html_items = "".join(
-                        f'<div class="mem-item">{"  ".join(i.split("]")[-1].strip().split("(confidence")[0].strip() for _ in [1])}</div>'
-                        for i in co_items
-                    )
-                    st.markdown(
-                        f'<div class="mem-card" style="margin-top:8px;">'
-                        f'<div class="mem-role">🏢 Site Context</div>'
-                        f'{html_items}</div>',
-                        unsafe_allow_html=True,
-                    )
+        memory_html = _render_memory_html(str(mem_path), _stamp(mem_path),
+                                          str(co_path),  _stamp(co_path))
+
+        if memory_html:
+            st.markdown(memory_html, unsafe_allow_html=True)
         else:
             st.caption("_Tell SiteWatch your role and site details — it remembers across sessions._")
             st.caption("Try: *\"I'm the site manager. Active works: crane level 12, concrete pour level 6, glazing crew on south facade.\"*")
 
     # ── Operations Handbook ───────────────────────────────────────────────
     with st.expander("📖 Operations Handbook", expanded=True):
-        uploaded = st.file_uploader(
-            "Drop PDF/TXT/HTML — auto-indexed instantly",
-            type=["pdf", "txt", "html", "md"],
-            label_visibility="collapsed",
-        )
-        # Auto-index on drop (no button needed)
-        if uploaded and uploaded.name not in st.session_state.indexed_files:
-            from app.rag.ingestion import ingest_file
-            with tempfile.NamedTemporaryFile(
-                delete=False, suffix=Path(uploaded.name).suffix
-            ) as tmp:
-                tmp.write(uploaded.read())
-                tmp_path = tmp.name
-            try:
-                with st.spinner(f"📥 Indexing {uploaded.name}…"):
-                    r = ingest_file(tmp_path, original_name=uploaded.name)
-                os.unlink(tmp_path)
-                st.session_state.indexed_files.add(uploaded.name)
-                st.success(f"✅ **{r['file']}** — {r['total_chunks']} chunks indexed ({r['new_chunks']} new)")
-                st.rerun()
-            except Exception as e:
-                st.error(str(e))
-                try:
-                    os.unlink(tmp_path)
-                except Exception:
-                    pass
-
-        # Show indexed sources
-        from app.rag.file_manager import list_sources, delete_source
-        srcs = list_sources()
-        if srcs:
-            for s in srcs:
-                c1, c2 = st.columns([5, 1])
-                c1.markdown(
-                    f'<span class="indexed-badge">✓ indexed</span> '
-                    f'<span style="font-size:12px; color:#cbd5e1;">{s["source"]}</span> '
-                    f'<span style="font-size:11px; color:#475569;">({s["chunks"]} chunks)</span>',
-                    unsafe_allow_html=True,
-                )
-                if c2.button("✕", key=f"rm_{s['source']}", help="Remove from index"):
-                    delete_source(s["source"])
-                    st.rerun()
-        else:
-            st.markdown(
-                '<span class="not-indexed-badge">no handbook indexed</span><br>'
-                '<span style="font-size:11px; color:#64748b;">Upload a handbook above or the sample '
-                '<code>sitewatch_handbook.txt</code> to enable citation-grounded answers.</span>',
-                unsafe_allow_html=True,
-            )
+        _handbook_panel()
 
     # ── How it works ─────────────────────────────────────────────────────
     with st.expander("ℹ️ How it works"):
@@ -249,8 +364,7 @@ The engine compares **actual conditions vs handbook thresholds** per activity:
     with c1:
         if st.button("🗑 Clear chat", use_container_width=True):
             st.session_state.messages = []
-            if st.session_state.sw:
-                st.session_state.sw.clear_history()
+            get_sw().clear_history()
             st.rerun()
     with c2:
         if st.session_state.messages:
@@ -272,33 +386,23 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ── Onboarding (shown only when chat is empty) ────────────────────────────
-if not st.session_state.messages:
-    col_examples, col_explain = st.columns([5, 4])
-
-    with col_examples:
-        st.markdown("**Quick start — try a query:**")
-        EXAMPLES = [
-            ("☀️ Morning briefing",
-             "Give me my morning briefing for the Sydney CBD site. We have crane ops, a concrete pour on level 4, and a glazing crew on the facade."),
-            ("🌬️ Wind go/no-go",
-             "Wind is 42 km/h in Austin, Texas. I have crane operations and a glazing crew active. Can we proceed?"),
-            ("🌡️ Concrete pour check",
-             "Is the temperature suitable for a concrete pour in Brisbane this afternoon?"),
-            ("👷 Heat stress check",
-             "What heat stress protocols apply for our outdoor crew in Darwin today? It's 40°C apparent."),
-            ("🌧️ Rain impact assessment",
-             "It's been raining all morning in Auckland. What works are affected?"),
-            ("💨 Austin weather for site ops",
-             "Austin weather for construction — what are current conditions?"),
-        ]
-        for label, query in EXAMPLES:
-            if st.button(label, key=f"ex_{label}", use_container_width=True):
-                st.session_state["prefill"] = query
-                st.rerun()
-
-    with col_explain:
-        st.markdown("**What happens when you ask:**")
-        st.code("""
+_EXAMPLES = (
+    ("☀️ Morning briefing",
+     "Give me my morning briefing for the Sydney CBD site. We have crane ops, a concrete pour on level 4, and a glazing crew on the facade."),
+    ("🌬️ Wind go/no-go",
+     "Wind is 42 km/h in Austin, Texas. I have crane operations and a glazing crew active. Can we proceed?"),
+    ("🌡️ Concrete pour check",
+     "Is the temperature suitable for a concrete pour in Brisbane this afternoon?"),
+    ("👷 Heat stress check",
+     "What heat stress protocols apply for our outdoor crew in Darwin today? It's 40°C apparent."),
+    ("🌧️ Rain impact assessment",
+     "It's been raining all morning in Auckland. What works are affected?"),
+    ("💨 Austin weather for site ops",
+     "Austin weather for construction — what are current conditions?"),
+)
+_EXAMPLE_KEYS = tuple(f"ex_{label}" for label, _ in _EXAMPLES)
+
+_PIPELINE_DIAGRAM = """
 Your question
      │
      ├─ 🧠 Memory   Who are you? Your role, site, works
@@ -319,39 +423,76 @@ Your question
    ✅ Concrete: GO (temp 21°C, within range)
 
    Overall Site Risk: HIGH"
-""", language="text")
+"""
 
-    st.divider()
+@st.fragment
+def _onboarding():
+    if not st.session_state.messages:
+        col_examples, col_explain = st.columns([5, 4])
+
+        with col_examples:
+            st.markdown("**Quick start — try a query:**")
+            for (label, query), key in zip(_EXAMPLES, _EXAMPLE_KEYS):
+                if st.button(label, key=key, use_container_width=True):
+                    st.session_state["prefill"] = query
+                    st.rerun()   # full app run, so the prefilled prompt is answered
+
+        with col_explain:
+            st.markdown("**What happens when you ask:**")
+            st.code(_PIPELINE_DIAGRAM, language="text")
+
+        st.divider()
+
+_onboarding()
 
 # ── Render chat history ───────────────────────────────────────────────────
-for msg in st.session_state.messages:
-    with st.chat_message(msg["role"]):
-        if msg["role"] == "assistant":
-            risk  = msg.get("risk_level", "UNKNOWN")
-            cls, label = RISK_STYLE.get(risk, RISK_STYLE["UNKNOWN"])
-            st.markdown(f'<div class="{cls}">{label}</div>', unsafe_allow_html=True)
-
-        st.markdown(msg["content"])
-
-        if msg["role"] == "assistant":
-            pills = ""
-            if msg.get("rag_available"):
-                pills += '<span class="src-pill src-rag">📖 Handbook</span>'
-            if msg.get("weather_available"):
-                pills += f'<span class="src-pill src-wx">🌤 {msg.get("weather_location","Weather")}</span>'
-            if msg.get("memory_used"):
-                pills += '<span class="src-pill src-mem">🧠 Profile</span>'
-            if pills:
-                st.markdown(f'<div style="margin-top:8px">{pills}</div>',
+# Fragments: a widget inside one reruns only that fragment, not the whole page
+@st.fragment
+def _render_history():
+    for msg in st.session_state.messages:
+        with st.chat_message(msg["role"]):
+            if msg["role"] == "assistant":
+                risk = msg.get("risk_level", "UNKNOWN")
+                st.markdown(RISK_STYLE_HTML.get(risk, RISK_STYLE_HTML["UNKNOWN"]),
                             unsafe_allow_html=True)
-            if msg.get("citations"):
-                st.caption("📎 " + " · ".join(msg["citations"]))
-            if msg.get("hallucinated"):
-                st.warning("⚠️ Removed unverifiable citations: " +
-                           ", ".join(msg["hallucinated"]), icon="🔍")
-            if msg.get("weather_raw"):
-                with st.expander(f"📊 Raw weather data — {msg.get('weather_location','')}"):
-                    st.code(msg["weather_raw"], language="text")
+
+            st.markdown(msg["content"])
+
+            if msg["role"] == "assistant":
+                # Built once per message (at answer time) and reused on every rerun
+                evidence = msg.get("evidence_html")
+                if evidence is None:
+                    evidence = msg["evidence_html"] = _evidence_html(
+                        msg.get("rag_available"), msg.get("weather_available"),
+                        msg.get("weather_location"), msg.get("memory_used"),
+                        msg.get("citations"), msg.get("hallucinated"),
+                    )
+                if evidence:
+                    st.markdown(evidence, unsafe_allow_html=True)
+                if msg.get("weather_raw_id"):
+                    with st.expander(f"📊 Raw weather data — {msg.get('weather_location','')}"):
+                        raw = _weather_raw_store().get(msg["weather_raw_id"])
+                        if raw is None:
+                            st.caption("_Raw weather data is no longer cached._")
+                        else:
+                            st.code(raw, language="text")
+
+_render_history()
+
+_STREAM_FLUSH_SECS = 0.05
+
+# RAG_INSTRUMENT=1 → one JSON timing line per query on stderr; off by default
+_timing_log = logging.getLogger("sitewatch.timing")
+if RAG_INSTRUMENT and not _timing_log.handlers:
+    _timing_log.addHandler(logging.StreamHandler(sys.stderr))
+    _timing_log.setLevel(logging.INFO)
+    _timing_log.propagate = False
+
+def _phase_ms(start, end):
+    """Milliseconds between two offsets; None if either stage never happened."""
+    if start is None or end is None:
+        return None
+    return round((end - start) * 1000, 1)
 
 # ── Chat input ─────────────────────────────────────────────────────────────
 prefill = st.session_state.pop("prefill", "")
@@ -367,16 +508,38 @@ if prompt:
     with st.chat_message("assistant"):
         sw = get_sw()
 
+        # Memory-file stamps, the index size and the recent turns location
+        # lookup reads are in the key, so a memory write, a handbook
+        # upload/delete or a different conversation never serves a stale answer
+        cache_key = cached = None
+        if RAG_ANSWER_CACHE:
+            cache_key = json.dumps([sw.user_id, _stamp(sw._user_mem_file), _stamp(sw._company_mem_file),
+                                    get_chunk_count(), sw.context_window(), prompt])
+            cached = _answer_cache().get(cache_key)
+            if cached is not None:
+                sw.record_turn(prompt, cached[1].answer)
+
         status_lines: List[str] = []
         status_box   = st.empty()
         risk_banner  = st.empty()
         answer_ph    = st.empty()
 
         streamed     = ""
+        pending      = ""    # tokens not yet pushed to the placeholder
+        last_flush   = 0.0
         final_result = None
 
-        for event in sw.stream_query(prompt):
+        # Offsets (s) from the start of the query; evidence stages are timed from
+        # the memory stage since RAG and weather run in parallel after it
+        t0 = time.monotonic()
+        stage_at = {}
+        t_first_token = None
+
+        events = _replay(*cached) if cached is not None else sw.stream_query(prompt)
+        for event in events:
             if event["type"] == "status":
+                if RAG_INSTRUMENT:
+                    stage_at.setdefault(event.get("stage"), time.monotonic() - t0)
                 if status_lines and "⏳" in status_lines[-1]:
                     status_lines[-1] = status_lines[-1].replace("⏳", "✓")
                 status_lines.append(f"⏳ {event['message']}")
@@ -390,38 +553,54 @@ if prompt:
                 )
 
             elif event["type"] == "token":
-                streamed += event["content"]
-                answer_ph.markdown(streamed + "▌")
+                # Repaint at most ~20×/s (or on a newline) rather than per token
+                pending += event["content"]
+                now = time.monotonic()
+                if t_first_token is None:
+                    t_first_token = now - t0
+                if now - last_flush > _STREAM_FLUSH_SECS or "\n" in event["content"]:
+                    streamed += pending
+                    pending = ""
+                    answer_ph.markdown(streamed + "▌")
+                    last_flush = now
 
             elif event["type"] == "done":
                 final_result = event["result"]
-
+                if RAG_INSTRUMENT:
+                    total = time.monotonic() - t0
+                    start = stage_at.get("memory", 0.0)
+                    synth = stage_at.get("synthesis", total)
+                    _timing_log.info(json.dumps({
+                        "event":            "query_timing",
+                        "user_id":          st.session_state.user_id,
+                        "answer_cache_hit": cached is not None,
+                        "t_search_ms":      _phase_ms(start, stage_at.get("rag")),
+                        "t_weather_ms":     _phase_ms(start, stage_at.get("weather")),
+                        "t_evidence_ms":    _phase_ms(start, synth),
+                        "t_first_token_ms": _phase_ms(synth, t_first_token),
+                        "t_stream_ms":      _phase_ms(synth, total),
+                        "total_ms":         _phase_ms(0.0, total),
+                    }))
+
+        streamed += pending
+        if cache_key is not None and cached is None and final_result is not None:
+            _answer_cache().put(cache_key, (streamed, final_result))
         status_box.empty()
         answer_ph.markdown(streamed)
 
+        evidence = ""
         if final_result:
-            risk  = final_result.risk_level
-            cls, label = RISK_STYLE.get(risk, RISK_STYLE["UNKNOWN"])
-            risk_banner.markdown(f'<div class="{cls}">{label}</div>',
-                                  unsafe_allow_html=True)
-
-            pills = ""
-            if final_result.rag_available:
-                pills += '<span class="src-pill src-rag">📖 Handbook</span>'
-            if final_result.weather_available:
-                pills += f'<span class="src-pill src-wx">🌤 {final_result.weather_location}</span>'
-            if final_result.memory_available:
-                pills += '<span class="src-pill src-mem">🧠 Profile</span>'
-            if pills:
-                st.markdown(f'<div style="margin-top:8px">{pills}</div>',
-                            unsafe_allow_html=True)
-
-            if final_result.citations:
-                st.caption("📎 " + " · ".join(final_result.citations))
-            # Memory write is now silent — no banner shown
-            if final_result.hallucinated:
-                st.warning("⚠️ Removed unverifiable citations: " +
-                           ", ".join(final_result.hallucinated), icon="🔍")
+            risk = final_result.risk_level
+            risk_banner.markdown(RISK_STYLE_HTML.get(risk, RISK_STYLE_HTML["UNKNOWN"]),
+                                 unsafe_allow_html=True)
+
+            evidence = _evidence_html(
+                final_result.rag_available, final_result.weather_available,
+                final_result.weather_location, final_result.memory_available,
+                final_result.citations, final_result.hallucinated,
+            )
+            if evidence:
+                st.markdown(evidence, unsafe_allow_html=True)
             if final_result.weather_available and final_result.weather_raw:
                 with st.expander(f"📊 Raw weather data — {final_result.weather_location}"):
                     st.code(final_result.weather_raw, language="text")
@@ -435,25 +614,38 @@ if prompt:
         "rag_available":    r.rag_available      if r else False,
         "weather_available": r.weather_available if r else False,
         "weather_location": r.weather_location   if r else None,
-        "weather_raw":      r.weather_raw        if r else "",
+        "weather_raw_id":   _weather_raw_store().put(r.weather_raw) if r and r.weather_raw else None,
         "memory_used":      r.memory_available   if r else False,
         "citations":        r.citations          if r else [],
         "hallucinated":     r.hallucinated       if r else [],
+        "evidence_html":    evidence,
     })
 
 # ── Session stats footer ───────────────────────────────────────────────────
-if st.session_state.messages:
-    turns = [m for m in st.session_state.messages if m["role"] == "user"]
-    wx_n  = sum(1 for m in st.session_state.messages if m.get("weather_available"))
-    doc_n = sum(1 for m in st.session_state.messages if m.get("rag_available"))
-    crit  = sum(1 for m in st.session_state.messages if m.get("risk_level") == "CRITICAL")
-    high  = sum(1 for m in st.session_state.messages if m.get("risk_level") == "HIGH")
-
-    st.divider()
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Queries",       len(turns))
-    c2.metric("Live weather",  wx_n)
-    c3.metric("Handbook used", doc_n)
-    c4.metric("High/Critical", high + crit,
-              delta=f"{crit} critical" if crit else None,
-              delta_color="inverse")
+@st.fragment
+def _render_footer():
+    if st.session_state.messages:
+        turns = wx_n = doc_n = crit = high = 0
+        for m in st.session_state.messages:
+            if m["role"] == "user":
+                turns += 1
+            if m.get("weather_available"):
+                wx_n += 1
+            if m.get("rag_available"):
+                doc_n += 1
+            risk = m.get("risk_level")
+            if risk == "CRITICAL":
+                crit += 1
+            elif risk == "HIGH":
+                high += 1
+
+        st.divider()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Queries",       turns)
+        c2.metric("Live weather",  wx_n)
+        c3.metric("Handbook used", doc_n)
+        c4.metric("High/Critical", high + crit,
+                  delta=f"{crit} critical" if crit else None,
+                  delta_color="inverse")
+
+_render_footer()